@@ -4,6 +4,7 @@ from pathlib import Path
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.api.responses import ORJSONResponse
 from app.api.routes import router as task_router
 from app.core.config import get_config
 from app.core.task_manager import get_task_manager
@@ -34,7 +35,8 @@ async def create_app(config_dir: Path | str = Path("config"), environment: str |
         version=config.api.version,
         docs_url=f"{config.api.prefix}/docs",
         redoc_url=f"{config.api.prefix}/redoc",
-        openapi_url=f"{config.api.prefix}/openapi.json"
+        openapi_url=f"{config.api.prefix}/openapi.json",
+        default_response_class=ORJSONResponse
     )
     
     app.include_router(task_router, prefix=config.api.prefix)
@@ -45,6 +47,9 @@ async def create_app(config_dir: Path | str = Path("config"), environment: str |
         """应用启动时初始化服务。"""
         logger.info("应用程序启动中...")
         
+        # 预先生成OpenAPI文档，避免首次访问文档时的延迟
+        app.openapi()
+        
         # 启动定期任务清理
         task_manager = get_task_manager()
         await task_manager.start_periodic_cleanup()
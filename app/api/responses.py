@@ -0,0 +1,22 @@
+"""
+API响应类
+"""
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+
+
+class ORJSONResponse(JSONResponse):
+    """使用orjson序列化的JSON响应"""
+    
+    def render(self, content: Any) -> bytes:
+        """将响应内容序列化为JSON字节串
+        
+        Args:
+            content: 响应内容
+            
+        Returns:
+            JSON字节串
+        """
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
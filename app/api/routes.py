@@ -2,12 +2,13 @@
 API路由定义
 """
 from fastapi import APIRouter, BackgroundTasks, HTTPException
+from app.api.responses import ORJSONResponse
 from app.api.schemas import (
     InferenceRequest, 
     InferenceResponse, 
-    TaskStatusResponse,
-    HealthResponse
+    TaskStatusResponse
 )
+from app.core.config import get_config
 from app.core.task_manager import get_task_manager
 from app.utils.logger import get_logger
 
@@ -29,19 +30,27 @@ async def create_inference_task(
     Returns:
         任务创建响应，包含任务ID和状态
     """
-    logger.info(f"收到推理任务请求: {request.input[:50]}...")
+    logger.info("收到推理任务请求: %.50s...", request.input)
     
     task_manager = get_task_manager()
-    task = await task_manager.create_task(request.model_dump())
+    # 请求已由FastAPI校验，直接取字段构造负载，省去model_dump的遍历
+    task = await task_manager.create_task({
+        "input": request.input,
+        "options": request.options
+    })
     
-    # 将任务放入后台执行
-    background_tasks.add_task(task_manager.run_task, task)
+    # 启用Celery时交给独立的worker进程执行，否则放入后台执行
+    if get_config().celery.enabled:
+        await task_manager.submit_celery_task(task)
+    else:
+        background_tasks.add_task(task_manager.run_task, task)
     
-    logger.info(f"已创建任务: {task.task_id}, 状态: {task.status}")
-    return InferenceResponse(
-        task_id=task.task_id,
-        status=task.status
-    )
+    logger.info("已创建任务: %s, 状态: %s", task.task_id, task.status)
+    # 直接返回响应，跳过response_model的二次校验和序列化
+    return ORJSONResponse({
+        "task_id": task.task_id,
+        "status": task.status
+    })
 
 
 @router.get("/task/{task_id}", response_model=TaskStatusResponse)
@@ -57,39 +66,39 @@ async def get_task_status(task_id: str):
     Raises:
         HTTPException: 当任务不存在时
     """
-    logger.info(f"查询任务状态: {task_id}")
+    logger.info("查询任务状态: %s", task_id)
     task = await get_task_manager().get_task(task_id)
     if not task:
-        logger.warning(f"任务不存在: {task_id}")
+        logger.warning("任务不存在: %s", task_id)
         raise HTTPException(status_code=404, detail=f"任务 {task_id} 不存在")
     
-    logger.info(f"获取到任务: {task_id}, 状态: {task.status}")
-    return TaskStatusResponse(
-        task_id=task.task_id,
-        status=task.status,
-        result=task.result,
-        created_at=task.created_at.isoformat() if task.created_at else None,
-        started_at=task.started_at.isoformat() if task.started_at else None,
-        completed_at=task.completed_at.isoformat() if task.completed_at else None,
-        error=task.error
-    )
+    logger.info("获取到任务: %s, 状态: %s", task_id, task.status)
+    return ORJSONResponse({
+        "task_id": task.task_id,
+        "status": task.status,
+        "result": task.result,
+        "created_at": task.created_at_iso,
+        "started_at": task.started_at_iso,
+        "completed_at": task.completed_at_iso,
+        "error": task.error
+    })
 
 
-@router.get("/health", response_model=HealthResponse)
+@router.get("/health", include_in_schema=False)
 async def health_check():
     """健康检查端点
     
+    高频探测路径，直接返回字典，不经过Pydantic模型校验
+    
     Returns:
-        健康状态信息
+        健康状态信息，包含status、version和tasks_count
     """
     logger.debug("收到健康检查请求")
     task_manager = get_task_manager()
-    tasks = await task_manager.get_all_tasks()
-    
-    response = HealthResponse(
-        status="healthy",
-        version="1.0.0",
-        tasks_count=len(tasks)
-    )
-    logger.debug(f"健康检查响应: {response.model_dump()}")
-    return response 
\ No newline at end of file
+    content = {
+        "status": "healthy",
+        "version": "1.0.0",
+        "tasks_count": await task_manager.count_tasks()
+    }
+    logger.debug("健康检查响应: %s", content)
+    return ORJSONResponse(content) 
\ No newline at end of file
@@ -26,10 +26,3 @@ class TaskStatusResponse(BaseModel):
     started_at: str | None = Field(default=None, description="任务开始时间")
     completed_at: str | None = Field(default=None, description="任务完成时间")
     error: str | None = Field(default=None, description="错误信息")
-
-
-class HealthResponse(BaseModel):
-    """健康检查响应"""
-    status: str = Field(..., description="服务状态")
-    version: str = Field(default="1.0.0", description="服务版本")
-    tasks_count: int = Field(default=0, description="当前任务数量") 
\ No newline at end of file
@@ -0,0 +1,48 @@
+"""
+Celery应用 - 在独立的worker进程中执行推理任务
+
+启动worker:
+    celery -A app.celery_app worker --loglevel=info
+"""
+import os
+import asyncio
+from typing import Dict, Any
+
+from celery import Celery
+
+from app.core.config import get_config
+from app.core.inference import execute_inference
+
+config = get_config()
+
+celery_app = Celery(
+    "app",
+    broker=os.getenv("CELERY_BROKER_URL", config.celery.broker_url),
+    backend=os.getenv("CELERY_RESULT_BACKEND", config.celery.result_backend),
+)
+celery_app.conf.update(
+    # 任务执行完成后再确认，worker异常退出时任务会重新投递
+    task_acks_late=True,
+    # 每个worker进程只预取一个任务，避免长任务堆积在单个进程
+    worker_prefetch_multiplier=1,
+    # 上报STARTED状态，API据此将任务标记为running
+    task_track_started=True,
+    task_time_limit=config.inference.timeout_seconds,
+)
+
+
+@celery_app.task(bind=True, max_retries=3, name="app.run_inference_task")
+def run_inference_task(self, task_id: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """在worker进程中执行推理任务
+    
+    Args:
+        task_id: 任务ID
+        payload: 任务负载数据
+        
+    Returns:
+        推理结果
+    """
+    try:
+        return asyncio.run(execute_inference(payload))
+    except Exception as e:
+        raise self.retry(exc=e, countdown=2 ** self.request.retries)
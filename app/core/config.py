@@ -2,11 +2,22 @@
 配置管理模块
 """
 import os
+import pickle
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, Any
 import yaml
 from pydantic import BaseModel, Field
 
+# 优先使用libyaml提供的C加载器，不可用时回退到纯Python实现
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+# 配置缓存目录(相对于配置文件目录)
+CONFIG_CACHE_DIR = ".cache"
+
 
 class InferenceConfig(BaseModel):
     """推理服务配置"""
@@ -27,6 +38,19 @@ class LoggingConfig(BaseModel):
     file_path: str = Field(default="logs/app.log", description="文件日志路径")
 
 
+class CeleryConfig(BaseModel):
+    """Celery任务队列配置"""
+    enabled: bool = Field(default=False, description="是否由Celery worker执行推理任务")
+    broker_url: str = Field(default="redis://localhost:6379/0", description="消息代理地址")
+    result_backend: str = Field(default="redis://localhost:6379/1", description="任务结果存储地址")
+
+
+class RedisConfig(BaseModel):
+    """Redis任务存储配置"""
+    enabled: bool = Field(default=False, description="是否将任务状态保存到Redis")
+    url: str = Field(default="redis://localhost:6379/2", description="Redis连接地址")
+
+
 class AppConfig(BaseModel):
     """应用全局配置"""
     app_name: str = "task-agent"
@@ -47,6 +71,8 @@ class Config(BaseModel):
     api: ApiConfig = Field(default_factory=ApiConfig)
     inference: InferenceConfig = Field(default_factory=InferenceConfig)
     logging: LoggingConfig = Field(default_factory=LoggingConfig)
+    celery: CeleryConfig = Field(default_factory=CeleryConfig)
+    redis: RedisConfig = Field(default_factory=RedisConfig)
 
 
 def load_config_from_file(config_dir: Path, environment: str = "local") -> Dict[str, Any]:
@@ -63,24 +89,68 @@ def load_config_from_file(config_dir: Path, environment: str = "local") -> Dict[
     if not config_file.exists():
         return {}
     
+    # 优先读取缓存，YAML文件未修改时跳过解析
+    mtime = config_file.stat().st_mtime_ns
+    cache_file = config_dir / CONFIG_CACHE_DIR / f"{environment}.yaml.pkl"
+    cached = _load_cached_config(cache_file, mtime)
+    if cached is not None:
+        return cached
+    
     with open(config_file, "r", encoding="utf-8") as f:
-        return yaml.safe_load(f) or {}
+        config_data = yaml.load(f, Loader=SafeLoader) or {}
+    
+    _save_cached_config(cache_file, mtime, config_data)
+    return config_data
 
 
-# 全局配置对象
-global_config = None
+def _load_cached_config(cache_file: Path, mtime: int) -> Dict[str, Any] | None:
+    """读取配置缓存
+    
+    Args:
+        cache_file: 缓存文件路径
+        mtime: 配置文件当前的修改时间
+        
+    Returns:
+        缓存的配置字典，缓存不存在或已过期时返回None
+    """
+    try:
+        with open(cache_file, "rb") as f:
+            cached_mtime, config_data = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, ValueError, TypeError):
+        return None
+    
+    if cached_mtime != mtime:
+        return None
+    return config_data
 
 
+def _save_cached_config(cache_file: Path, mtime: int, config_data: Dict[str, Any]) -> None:
+    """写入配置缓存，写入失败(如只读文件系统)时忽略
+    
+    Args:
+        cache_file: 缓存文件路径
+        mtime: 配置文件的修改时间
+        config_data: 解析后的配置字典
+    """
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        # 先写临时文件再替换，避免多进程同时启动时读到不完整的缓存
+        tmp_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_file, "wb") as f:
+            pickle.dump((mtime, config_data), f, protocol=5)
+        os.replace(tmp_file, cache_file)
+    except OSError:
+        pass
+
+
+@lru_cache(maxsize=1)
 def get_config() -> Config:
-    """获取全局配置对象
+    """获取全局配置对象，首次调用时加载并缓存
     
     Returns:
         全局配置对象
     """
-    global global_config
-    if global_config is None:
-        environment = os.environ.get("ENV", "local")
-        config_dir = Path("config")
-        config_data = load_config_from_file(config_dir, environment)
-        global_config = Config(**config_data)
-    return global_config 
\ No newline at end of file
+    environment = os.environ.get("ENV", "local")
+    config_dir = Path("config")
+    config_data = load_config_from_file(config_dir, environment)
+    return Config(**config_data) 
\ No newline at end of file
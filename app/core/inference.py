@@ -0,0 +1,24 @@
+"""
+推理执行模块 - 推理任务的具体处理逻辑，供进程内执行和Celery worker共用
+"""
+from typing import Dict, Any
+import asyncio
+
+
+async def execute_inference(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """执行推理
+    
+    Args:
+        payload: 任务负载数据
+        
+    Returns:
+        推理结果
+    """
+    # 这里是任务执行逻辑
+    # 为了演示，我们模拟一个处理时间
+    await asyncio.sleep(2)
+    
+    # 假设任务处理成功
+    return {
+        "output": f"Processed input: {payload.get('input', '')}"
+    }
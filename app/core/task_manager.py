@@ -1,21 +1,61 @@
 """
 任务管理器模块 - 负责任务的创建、执行和状态管理
 """
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Collection
 import asyncio
-import uuid
-from uuid import UUID
+import json
+from collections import deque
+import secrets
 import time
+from functools import lru_cache
+from types import MappingProxyType
 from datetime import datetime, timedelta
+from cachetools import TTLCache
 from app.core.config import get_config
+from app.core.inference import execute_inference
 from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# 所有任务状态
+TASK_STATUSES = ("pending", "running", "completed", "failed", "cancelled")
+# 终态：任务不会再发生状态变化
+TERMINAL_STATUSES = frozenset(("completed", "failed", "cancelled"))
+
+# Redis中任务哈希的键前缀
+REDIS_KEY_PREFIX = "task:"
+# Redis中记录全部任务ID的有序集合，分值为任务键的过期时间戳，用于快速统计任务数量
+REDIS_INDEX_KEY = "tasks:index"
+
+# get_task缓存的有效期(秒)：未结束的任务状态会变化，只短暂缓存以吸收轮询请求
+TASK_CACHE_TTL_SECONDS = 1.5
+# 已结束的任务状态不再变化，可以缓存更长时间
+TERMINAL_TASK_CACHE_TTL_SECONDS = 60
+TASK_CACHE_MAX_SIZE = 4096
+
 
 class Task:
     """任务类，表示一个异步执行的任务"""
     
+    # 固定属性布局，省去每个实例的__dict__
+    __slots__ = (
+        "task_id",
+        "id",
+        "payload",
+        "type",
+        "status",
+        "result",
+        "_created_at",
+        "_created_at_iso",
+        "updated_at",
+        "_started_at",
+        "_started_at_iso",
+        "_completed_at",
+        "_completed_at_iso",
+        "error",
+        "progress",
+    )
+    
     def __init__(self, task_id: str, payload: Dict[str, Any]):
         """初始化任务
         
@@ -27,14 +67,102 @@ class Task:
         self.id = task_id  # 兼容旧代码
         self.payload: Dict[str, Any] = payload
         self.type = payload.get("type", "inference")  # 兼容旧代码
-        self.status: str = "pending"  # pending, running, completed, failed
+        self.status: str = "pending"  # pending, running, completed, failed, cancelled
         self.result: Dict[str, Any] | None = None
-        self.created_at: datetime = datetime.now()
-        self.updated_at: datetime = datetime.now()  # 兼容旧代码
-        self.started_at: datetime | None = None
-        self.completed_at: datetime | None = None
+        now = datetime.now()
+        self.created_at = now
+        self.updated_at: datetime = now  # 兼容旧代码
+        self.started_at = None
+        self.completed_at = None
         self.error: str | None = None
         self.progress: float = 0.0  # 兼容旧代码
+    
+    # 时间字段在赋值时同步缓存ISO格式字符串，避免轮询查询时重复格式化
+    
+    @property
+    def created_at(self) -> datetime:
+        """任务创建时间"""
+        return self._created_at
+    
+    @created_at.setter
+    def created_at(self, value: datetime) -> None:
+        self._created_at = value
+        self._created_at_iso = value.isoformat()
+    
+    @property
+    def created_at_iso(self) -> str:
+        """任务创建时间的ISO格式字符串"""
+        return self._created_at_iso
+    
+    @property
+    def started_at(self) -> datetime | None:
+        """任务开始时间"""
+        return self._started_at
+    
+    @started_at.setter
+    def started_at(self, value: datetime | None) -> None:
+        self._started_at = value
+        self._started_at_iso = value.isoformat() if value else None
+    
+    @property
+    def started_at_iso(self) -> str | None:
+        """任务开始时间的ISO格式字符串"""
+        return self._started_at_iso
+    
+    @property
+    def completed_at(self) -> datetime | None:
+        """任务完成时间"""
+        return self._completed_at
+    
+    @completed_at.setter
+    def completed_at(self, value: datetime | None) -> None:
+        self._completed_at = value
+        self._completed_at_iso = value.isoformat() if value else None
+    
+    @property
+    def completed_at_iso(self) -> str | None:
+        """任务完成时间的ISO格式字符串"""
+        return self._completed_at_iso
+    
+    def to_redis_hash(self) -> Dict[str, str]:
+        """转换为可写入Redis哈希的字符串映射
+        
+        Returns:
+            字段名到字符串值的映射
+        """
+        return {
+            "task_id": self.task_id,
+            "payload": json.dumps(self.payload, ensure_ascii=False),
+            "status": self.status,
+            "result": json.dumps(self.result, ensure_ascii=False),
+            "created_at": self.created_at_iso,
+            "updated_at": self.updated_at.isoformat(),
+            "started_at": self.started_at_iso or "",
+            "completed_at": self.completed_at_iso or "",
+            "error": json.dumps(self.error, ensure_ascii=False),
+            "progress": str(self.progress),
+        }
+    
+    @classmethod
+    def from_redis_hash(cls, data: Dict[str, str]) -> "Task":
+        """从Redis哈希还原任务对象
+        
+        Args:
+            data: to_redis_hash生成的字符串映射
+            
+        Returns:
+            任务对象
+        """
+        task = cls(data["task_id"], json.loads(data["payload"]))
+        task.status = data["status"]
+        task.result = json.loads(data["result"])
+        task.created_at = datetime.fromisoformat(data["created_at"])
+        task.updated_at = datetime.fromisoformat(data["updated_at"])
+        task.started_at = datetime.fromisoformat(data["started_at"]) if data["started_at"] else None
+        task.completed_at = datetime.fromisoformat(data["completed_at"]) if data["completed_at"] else None
+        task.error = json.loads(data["error"])
+        task.progress = float(data["progress"])
+        return task
 
 
 class TaskManager:
@@ -43,18 +171,117 @@ class TaskManager:
     def __init__(self):
         """初始化任务管理器"""
         self.tasks: Dict[str, Task] = {}
+        # 任务表的只读视图，供外部遍历而无需复制
+        self._tasks_view = MappingProxyType(self.tasks)
+        # 按状态索引的任务ID，避免按状态过滤时遍历全部任务。
+        # 使用值为None的字典作为有序集合，保持任务进入该状态的先后顺序
+        self._by_status: Dict[str, Dict[str, None]] = {status: {} for status in TASK_STATUSES}
+        # 按进入终态的先后顺序记录的任务ID，用于超出数量限制时淘汰最早结束的任务
+        self._terminal_order: deque[str] = deque()
         self.config = get_config()
-        self.semaphore = asyncio.Semaphore(
-            self.config.inference.max_concurrent_tasks
-        )
+        # 待执行任务队列，由固定数量的常驻worker协程消费以限制并发。
+        # 队列会绑定到首次使用它的事件循环，因此与worker一起创建和释放
+        self._queue: asyncio.Queue[Task] | None = None
+        self._workers: List[asyncio.Task] = []
         self._start_time = time.time()
         self._completed_count = 0
         self._failed_count = 0
         self._cleanup_task = None
+        self._sweep_task = None
+        # get_task的查询缓存，按任务是否结束使用不同的有效期。
+        # 只在需要访问Redis或Celery结果存储时启用，内存模式下直接查任务表更快
+        self._cache: TTLCache[str, Task] = TTLCache(
+            maxsize=TASK_CACHE_MAX_SIZE, ttl=TASK_CACHE_TTL_SECONDS
+        )
+        self._terminal_cache: TTLCache[str, Task] = TTLCache(
+            maxsize=TASK_CACHE_MAX_SIZE, ttl=TERMINAL_TASK_CACHE_TTL_SECONDS
+        )
+        self._redis = None
+        if self.config.redis.enabled:
+            import redis.asyncio as aioredis
+            self._redis = aioredis.from_url(self.config.redis.url, decode_responses=True)
+        self._use_cache = self._redis is not None or self.config.celery.enabled
+    
+    def _set_status(self, task: Task, status: str) -> None:
+        """更新任务状态并同步状态索引
+        
+        Args:
+            task: 任务对象
+            status: 新状态
+        """
+        # 启用Redis时任务不在本地任务表中，无需维护索引
+        tracked = self.tasks.get(task.task_id) is task
+        if tracked:
+            self._by_status[task.status].pop(task.task_id, None)
+        task.status = status
+        if tracked:
+            self._by_status[status][task.task_id] = None
+    
+    def _remove_task(self, task_id: str) -> None:
+        """从任务表和状态索引中删除任务
+        
+        Args:
+            task_id: 任务ID
+        """
+        task = self.tasks.pop(task_id, None)
+        if task is not None:
+            self._by_status[task.status].pop(task_id, None)
+        self._cache.pop(task_id, None)
+        self._terminal_cache.pop(task_id, None)
+    
+    def _cache_task(self, task: Task) -> None:
+        """按任务当前状态写入查询缓存
+        
+        Args:
+            task: 任务对象
+        """
+        if not self._use_cache:
+            return
+        
+        if task.status in TERMINAL_STATUSES:
+            self._cache.pop(task.task_id, None)
+            self._terminal_cache[task.task_id] = task
+        else:
+            self._cache[task.task_id] = task
+    
+    async def _persist_task(self, task: Task) -> None:
+        """将任务状态写入Redis，未启用Redis时不做任何操作
+        
+        过期清理由Redis键的TTL完成
+        
+        Args:
+            task: 任务对象
+        """
+        if self._redis is None:
+            return
+        
+        key = f"{REDIS_KEY_PREFIX}{task.task_id}"
+        retention_hours = self.config.inference.task_retention_hours
+        async with self._redis.pipeline(transaction=False) as pipe:
+            pipe.hset(key, mapping=task.to_redis_hash())
+            # 保留时间为0表示不清理
+            if retention_hours > 0:
+                pipe.expire(key, retention_hours * 3600)
+                expire_at = time.time() + retention_hours * 3600
+            else:
+                expire_at = float("inf")
+            pipe.zadd(REDIS_INDEX_KEY, {task.task_id: expire_at})
+            await pipe.execute()
+    
+    async def close(self) -> None:
+        """停止worker协程并释放任务管理器持有的外部连接"""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+        
+        if self._redis is not None:
+            await self._redis.aclose()
     
     async def start_periodic_cleanup(self) -> None:
         """启动定期清理任务"""
-        if self._cleanup_task is None:
+        if self._cleanup_task is None or self._cleanup_task.done():
             self._cleanup_task = asyncio.create_task(self._periodic_cleanup())
             logger.info("已启动定期任务清理")
     
@@ -75,6 +302,11 @@ class TaskManager:
         Returns:
             清理的任务数量
         """
+        # Celery执行的任务只在被查询时同步状态，清理前统一同步，
+        # 使无人查询的已结束任务也能按规则清理
+        if self.config.celery.enabled:
+            await self._sync_celery_tasks()
+        
         # 如果保留时间为0，表示不清理
         retention_hours = self.config.inference.task_retention_hours
         if retention_hours <= 0:
@@ -84,34 +316,43 @@ class TaskManager:
         expired_task_ids = []
         
         # 找出所有已完成或失败且超过保留期的任务
-        for task_id, task in self.tasks.items():
-            if task.status in ["completed", "failed", "cancelled"]:
+        for status in TERMINAL_STATUSES:
+            for task_id in self._by_status[status]:
+                task = self.tasks[task_id]
                 if task.completed_at and task.completed_at < retention_limit:
                     expired_task_ids.append(task_id)
         
+        # Celery结果存储中查不到结果(如消息丢失)的任务会一直停留在未结束状态，
+        # 超过保留期后同样清理
+        if self.config.celery.enabled:
+            for status in ("pending", "running"):
+                for task_id in self._by_status[status]:
+                    if self.tasks[task_id].created_at < retention_limit:
+                        expired_task_ids.append(task_id)
+        
         # 删除过期任务
         for task_id in expired_task_ids:
-            del self.tasks[task_id]
+            self._remove_task(task_id)
+        
+        # 丢弃队首已被删除的任务ID，避免队列无限增长
+        while self._terminal_order and self._terminal_order[0] not in self.tasks:
+            self._terminal_order.popleft()
         
         if expired_task_ids:
             logger.info(f"已清理 {len(expired_task_ids)} 个过期任务")
         
         # 检查是否超过最大任务数
         max_tasks = self.config.inference.max_tasks_count
-        if len(self.tasks) > max_tasks:
-            # 按创建时间排序，保留较新的任务
-            sorted_tasks = sorted(
-                [(task_id, task) for task_id, task in self.tasks.items() 
-                 if task.status in ["completed", "failed", "cancelled"]],
-                key=lambda x: x[1].created_at
-            )
-            
-            # 计算需要删除的数量
-            to_remove = len(self.tasks) - max_tasks
-            if to_remove > 0:
-                for task_id, _ in sorted_tasks[:to_remove]:
-                    del self.tasks[task_id]
-                logger.info(f"已删除 {to_remove} 个任务以满足最大任务数限制")
+        removed_count = 0
+        # 按结束顺序淘汰最早结束的任务，保留较新的任务
+        while len(self.tasks) > max_tasks and self._terminal_order:
+            task_id = self._terminal_order.popleft()
+            # 任务可能已按保留期被删除
+            if task_id in self.tasks:
+                self._remove_task(task_id)
+                removed_count += 1
+        if removed_count:
+            logger.info("已删除 %d 个任务以满足最大任务数限制", removed_count)
         
         return len(expired_task_ids)
     
@@ -124,13 +365,20 @@ class TaskManager:
         Returns:
             新创建的任务对象
         """
-        # 创建任务前检查是否需要清理
-        await self.cleanup_expired_tasks()
+        # 任务数量明显超出上限时在后台触发一次清理，不阻塞请求
+        if len(self.tasks) >= self.config.inference.max_tasks_count * 1.1:
+            if self._sweep_task is None or self._sweep_task.done():
+                self._sweep_task = asyncio.create_task(self.cleanup_expired_tasks())
         
-        task_id = str(uuid.uuid4())
+        task_id = secrets.token_hex(16)
         task = Task(task_id, payload)
-        self.tasks[task_id] = task
-        logger.debug(f"创建新任务: {task_id}")
+        if self._redis is None:
+            self.tasks[task_id] = task
+            self._by_status[task.status][task_id] = None
+        else:
+            # 启用Redis时任务只保存在Redis中，供所有worker进程共享
+            await self._persist_task(task)
+        logger.debug("创建新任务: %s", task_id)
         return task
     
     async def get_task(self, task_id: str) -> Task | None:
@@ -142,53 +390,246 @@ class TaskManager:
         Returns:
             任务对象，如不存在返回None
         """
-        task = self.tasks.get(task_id)
+        if self._use_cache:
+            task = self._terminal_cache.get(task_id) or self._cache.get(task_id)
+            if task:
+                return task
+        
+        if self._redis is None:
+            task = self.tasks.get(task_id)
+        else:
+            # 以Redis为准：任务可能由其他worker进程创建或修改
+            data = await self._redis.hgetall(f"{REDIS_KEY_PREFIX}{task_id}")
+            task = Task.from_redis_hash(data) if data else None
+        
         if not task:
-            logger.warning(f"尝试获取不存在的任务: {task_id}")
+            logger.warning("尝试获取不存在的任务: %s", task_id)
+        else:
+            if self.config.celery.enabled and task.status not in TERMINAL_STATUSES:
+                await self._sync_celery_state(task)
+            self._cache_task(task)
         return task
     
-    async def run_task(self, task: Task) -> None:
-        """执行任务
+    async def submit_celery_task(self, task: Task) -> None:
+        """将任务投递给Celery worker执行
         
         Args:
             task: 要执行的任务对象
         """
-        task.status = "running"
-        task.started_at = datetime.now()
-        task.updated_at = datetime.now()  # 兼容旧代码
-        logger.info(f"开始执行任务: {task.task_id}")
+        from app.celery_app import run_inference_task
         
-        async with self.semaphore:
-            try:
-                # 这里是任务执行逻辑
-                # 为了演示，我们模拟一个处理时间
-                await asyncio.sleep(2)
-                
-                # 假设任务处理成功
-                task.result = {
-                    "output": f"Processed input: {task.payload.get('input', '')}"
-                }
-                task.status = "completed"
+        try:
+            # 投递消息是同步网络调用，放到线程中执行以免阻塞事件循环
+            await asyncio.to_thread(
+                run_inference_task.apply_async,
+                args=(task.task_id, task.payload),
+                task_id=task.task_id
+            )
+        except Exception as e:
+            # 投递失败(如消息代理不可用)的任务不会被执行，直接标记为失败
+            logger.error("投递任务到Celery失败: %s, 错误: %s", task.task_id, e)
+            now = datetime.now()
+            task.error = f"任务投递失败: {e}"
+            task.result = {"error": task.error}
+            self._set_status(task, "failed")
+            self._failed_count += 1
+            task.completed_at = now
+            task.updated_at = now  # 兼容旧代码
+            self._terminal_order.append(task.task_id)
+            self._cache_task(task)
+            await self._persist_task(task)
+            return
+        logger.info("已投递任务到Celery: %s", task.task_id)
+    
+    async def _sync_celery_tasks(self) -> None:
+        """同步本进程所有未结束任务的Celery状态"""
+        active_tasks = [
+            self.tasks[task_id]
+            for status in ("pending", "running")
+            for task_id in self._by_status[status]
+        ]
+        results = await asyncio.gather(
+            *(self._sync_celery_state(task) for task in active_tasks),
+            return_exceptions=True
+        )
+        errors = [result for result in results if isinstance(result, Exception)]
+        if errors:
+            logger.warning("同步 %d 个任务的Celery状态失败: %s", len(errors), errors[0])
+    
+    async def _sync_celery_state(self, task: Task) -> None:
+        """从Celery结果存储同步任务状态
+        
+        Args:
+            task: 由Celery执行的任务对象
+        """
+        from celery.result import AsyncResult
+        from app.celery_app import celery_app
+        
+        def fetch_state() -> tuple[str, Any]:
+            result = AsyncResult(task.task_id, app=celery_app)
+            return result.state, result.result
+        
+        previous_status = task.status
+        state, result = await asyncio.to_thread(fetch_state)
+        # 等待结果期间其他查询或清理可能已同步过该任务，避免重复应用状态变化
+        if task.status != previous_status or task.status in TERMINAL_STATUSES:
+            return
+        now = datetime.now()
+        
+        if state == "STARTED" and task.status == "pending":
+            self._set_status(task, "running")
+            task.started_at = now
+            task.updated_at = now  # 兼容旧代码
+        elif state in ("SUCCESS", "FAILURE", "REVOKED"):
+            if task.started_at is None:
+                task.started_at = now
+            if state == "SUCCESS":
+                task.result = result
+                self._set_status(task, "completed")
                 task.progress = 1.0  # 兼容旧代码
                 self._completed_count += 1
-                logger.info(f"任务执行成功: {task.task_id}")
-            except Exception as e:
-                task.error = str(e)
-                task.status = "failed"
-                task.result = {"error": str(e)}
+            elif state == "FAILURE":
+                task.error = str(result)
+                task.result = {"error": str(result)}
+                self._set_status(task, "failed")
                 self._failed_count += 1
-                logger.error(f"任务执行失败: {task.task_id}, 错误: {str(e)}")
+            else:
+                self._set_status(task, "cancelled")
+            task.completed_at = now
+            task.updated_at = now  # 兼容旧代码
+            self._terminal_order.append(task.task_id)
+        
+        if task.status != previous_status:
+            await self._persist_task(task)
+    
+    def _start_workers(self) -> None:
+        """按最大并发数启动worker协程，已有worker在运行时不做任何操作"""
+        # 事件循环结束后旧的worker都已完成，需要在当前循环中重新创建
+        if any(not worker.done() for worker in self._workers):
+            return
+        
+        self._queue = asyncio.Queue()
+        self._workers = [
+            asyncio.create_task(self._worker())
+            for _ in range(self.config.inference.max_concurrent_tasks)
+        ]
+        logger.info("已启动 %d 个任务执行worker", len(self._workers))
+    
+    async def _worker(self) -> None:
+        """从队列中取出任务并逐个执行"""
+        queue = self._queue
+        while True:
+            try:
+                task = await queue.get()
+            except Exception as e:
+                logger.error("任务执行worker退出: %s", e)
+                raise
+            try:
+                # 排队期间已被取消的任务不再执行
+                if not await self._is_cancelled(task):
+                    await self._execute_task(task)
+            except Exception as e:
+                logger.error("任务执行worker出错: %s", e)
             finally:
-                task.completed_at = datetime.now()
-                task.updated_at = datetime.now()  # 兼容旧代码
+                queue.task_done()
+    
+    async def _is_cancelled(self, task: Task) -> bool:
+        """检查任务是否已被取消
+        
+        启用Redis时cancel_task修改的是从Redis读取的副本，需要以Redis中的状态为准
+        
+        Args:
+            task: 任务对象
+            
+        Returns:
+            任务已被取消时返回True
+        """
+        if task.status == "cancelled":
+            return True
+        if self._redis is None:
+            return False
+        
+        status = await self._redis.hget(f"{REDIS_KEY_PREFIX}{task.task_id}", "status")
+        if status == "cancelled":
+            task.status = status
+            return True
+        return False
     
-    async def get_all_tasks(self) -> List[Task]:
-        """获取所有任务列表
+    async def run_task(self, task: Task) -> None:
+        """将任务加入执行队列，由worker协程异步执行
+        
+        Args:
+            task: 要执行的任务对象
+        """
+        self._start_workers()
+        await self._queue.put(task)
+    
+    async def _execute_task(self, task: Task) -> None:
+        """执行任务
+        
+        Args:
+            task: 要执行的任务对象
+        """
+        self._set_status(task, "running")
+        now = datetime.now()
+        task.started_at = now
+        task.updated_at = now  # 兼容旧代码
+        await self._persist_task(task)
+        logger.info("开始执行任务: %s", task.task_id)
+        
+        try:
+            task.result = await execute_inference(task.payload)
+            self._set_status(task, "completed")
+            task.progress = 1.0  # 兼容旧代码
+            self._completed_count += 1
+            logger.info("任务执行成功: %s", task.task_id)
+        except Exception as e:
+            task.error = str(e)
+            self._set_status(task, "failed")
+            task.result = {"error": str(e)}
+            self._failed_count += 1
+            logger.error("任务执行失败: %s, 错误: %s", task.task_id, e)
+        finally:
+            end = datetime.now()
+            task.completed_at = end
+            task.updated_at = end  # 兼容旧代码
+            self._terminal_order.append(task.task_id)
+            self._cache_task(task)
+            await self._persist_task(task)
+    
+    async def get_all_tasks(self) -> Collection[Task]:
+        """获取所有任务
         
         Returns:
-            所有任务对象列表
+            所有任务对象。未启用Redis时为任务表的只读视图，调用方只应遍历，
+            需要修改时自行复制为列表
         """
-        return list(self.tasks.values())
+        if self._redis is None:
+            return self._tasks_view.values()
+        
+        keys = [key async for key in self._redis.scan_iter(match=f"{REDIS_KEY_PREFIX}*", count=500)]
+        async with self._redis.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.hgetall(key)
+            results = await pipe.execute()
+        # 扫描与读取之间过期的键会返回空哈希
+        return [Task.from_redis_hash(data) for data in results if data]
+    
+    async def count_tasks(self) -> int:
+        """获取当前任务数量，不读取任务内容
+        
+        Returns:
+            任务数量
+        """
+        if self._redis is None:
+            return len(self.tasks)
+        
+        # 先移除已过期任务的ID，剩余数量即当前任务数
+        async with self._redis.pipeline(transaction=False) as pipe:
+            pipe.zremrangebyscore(REDIS_INDEX_KEY, "-inf", time.time())
+            pipe.zcard(REDIS_INDEX_KEY)
+            _, count = await pipe.execute()
+        return count
 
     # 兼容方法 - 为CLI和其他模块提供兼容性
     
@@ -202,11 +643,16 @@ class TaskManager:
         Returns:
             任务列表
         """
-        tasks = await self.get_all_tasks()
-        
-        if status:
+        # 状态索引只覆盖本进程的任务，启用Redis时从全部任务中过滤
+        if status and self._redis is not None:
+            status_str = str(status).lower()
+            tasks = [task for task in await self.get_all_tasks() if task.status == status_str]
+        elif status:
             status_str = str(status).lower()
-            tasks = [task for task in tasks if str(task.status).lower() == status_str]
+            task_ids = self._by_status.get(status_str, ())
+            tasks = [self.tasks[task_id] for task_id in task_ids]
+        else:
+            tasks = list(await self.get_all_tasks())
         
         if task_type:
             tasks = [task for task in tasks if task.type == task_type]
@@ -223,40 +669,55 @@ class TaskManager:
         if not task:
             raise ValueError(f"Task {task_id} not found")
         
-        task.status = "cancelled"
+        # 已结束的任务无法取消，保持其状态和统计不变
+        if task.status in TERMINAL_STATUSES:
+            logger.info("任务已结束，忽略取消: %s, 状态: %s", task_id, task.status)
+            return
+        
+        if self.config.celery.enabled:
+            from app.celery_app import celery_app
+            await asyncio.to_thread(celery_app.control.revoke, task_id)
+        
+        # 本进程中正在执行的任务结束时会自行记录结束顺序，避免重复记录
+        running_locally = task.status == "running" and not self.config.celery.enabled
+        self._set_status(task, "cancelled")
         task.updated_at = datetime.now()
-        logger.info(f"已取消任务: {task_id}")
+        if not running_locally:
+            self._terminal_order.append(task_id)
+        self._cache_task(task)
+        await self._persist_task(task)
+        logger.info("已取消任务: %s", task_id)
         
     def get_metrics(self) -> Dict[str, Any]:
         """获取指标，兼容旧方法
         
+        启用Redis时任务不保存在本进程中，task_count、running_tasks和pending_tasks
+        无法在本地统计，返回None；任务总数可通过count_tasks获取。
+        completed_tasks和failed_tasks只统计本进程执行或同步的任务
+        
         Returns:
             指标字典
         """
+        local = self._redis is None
         metrics = {
-            "task_count": len(self.tasks),
-            "running_tasks": len([t for t in self.tasks.values() if t.status == "running"]),
-            "pending_tasks": len([t for t in self.tasks.values() if t.status == "pending"]),
+            "task_count": len(self.tasks) if local else None,
+            "running_tasks": len(self._by_status["running"]) if local else None,
+            "pending_tasks": len(self._by_status["pending"]) if local else None,
             "completed_tasks": self._completed_count,
             "failed_tasks": self._failed_count,
             "uptime": time.time() - self._start_time
         }
-        logger.debug(f"获取任务指标: {metrics}")
+        logger.debug("获取任务指标: %s", metrics)
         return metrics
 
 
-# 全局任务管理器实例
-global_task_manager = None
-
-
+@lru_cache(maxsize=1)
 def get_task_manager() -> TaskManager:
-    """获取全局任务管理器实例
+    """获取全局任务管理器实例，首次调用时创建并缓存
     
     Returns:
         全局任务管理器实例
     """
-    global global_task_manager
-    if global_task_manager is None:
-        global_task_manager = TaskManager()
-        logger.info("已创建新的全局任务管理器实例")
-    return global_task_manager 
\ No newline at end of file
+    task_manager = TaskManager()
+    logger.info("已创建新的全局任务管理器实例")
+    return task_manager 
\ No newline at end of file
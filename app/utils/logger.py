@@ -19,12 +19,20 @@ LOG_LEVELS = {
     "CRITICAL": logging.CRITICAL
 }
 
+# 是否已完成全局日志配置
+_configured = False
+
 
 def configure_logging() -> None:
     """配置全局日志设置
     
-    从配置文件读取日志级别和格式，设置全局日志配置
+    从配置文件读取日志级别和格式，设置全局日志配置。
+    只在首次成功调用时生效，重复调用不会重复添加处理器
     """
+    global _configured
+    if _configured:
+        return
+    
     config = get_config()
     log_config = config.logging
     
@@ -47,7 +55,8 @@ def configure_logging() -> None:
     if log_config.file_enabled:
         # 确保日志目录存在
         log_dir = os.path.dirname(log_config.file_path)
-        os.makedirs(log_dir, exist_ok=True)
+        if log_dir:
+            os.makedirs(log_dir, exist_ok=True)
         
         # 创建文件处理器 (按天滚动)
         file_handler = logging.handlers.TimedRotatingFileHandler(
@@ -69,6 +78,9 @@ def configure_logging() -> None:
     logging.getLogger("uvicorn").setLevel(log_level)
     logging.getLogger("uvicorn.access").setLevel(log_level)
     logging.getLogger("fastapi").setLevel(log_level)
+    
+    # 处理器全部添加完成后再标记，配置加载失败时允许再次调用
+    _configured = True
 
 
 def get_logger(name: str) -> logging.Logger:
@@ -2,10 +2,13 @@
 任务代理应用入口点
 """
 import os
+import sys
 import uvicorn
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.api.responses import ORJSONResponse
+
 # 导入日志配置
 from app.utils.logger import configure_logging, get_logger
 
@@ -28,7 +31,8 @@ app = FastAPI(
     version=config.api.version,
     docs_url=f"{config.api.prefix}/docs",
     redoc_url=f"{config.api.prefix}/redoc",
-    openapi_url=f"{config.api.prefix}/openapi.json"
+    openapi_url=f"{config.api.prefix}/openapi.json",
+    default_response_class=ORJSONResponse
 )
 
 # 添加路由
@@ -61,6 +65,9 @@ async def startup_event():
     """应用启动时执行的异步操作"""
     logger.info("应用程序启动中...")
     
+    # 预先生成OpenAPI文档，避免首次访问文档时的延迟
+    app.openapi()
+    
     # 启动任务清理
     task_manager = get_task_manager()
     await task_manager.start_periodic_cleanup()
@@ -93,16 +100,20 @@ async def shutdown_event():
     except Exception as e:
         logger.error(f"最终任务清理失败: {str(e)}")
     
+    # 关闭Redis等外部连接
+    await task_manager.close()
+    
     logger.info("应用程序关闭完成")
 
 
-def start_server(host="0.0.0.0", port=8000, dev_mode=True):
+def start_server(host="0.0.0.0", port=8000, dev_mode=True, workers=1):
     """启动服务器
     
     Args:
         host: 监听主机
         port: 监听端口
         dev_mode: 是否为开发模式(启用热重载)
+        workers: 生产模式下的worker进程数
     """
     log_level = config.logging.level.lower()
     
@@ -117,13 +128,17 @@ def start_server(host="0.0.0.0", port=8000, dev_mode=True):
             log_level=log_level
         )
     else:
-        # 生产模式：直接使用app实例
-        logger.info(f"以生产模式启动服务，监听 {host}:{port}")
+        # 生产模式：显式使用uvloop事件循环和httptools解析器，避免依赖缺失时静默回退
+        # 多worker进程需要字符串引用
+        logger.info(f"以生产模式启动服务，监听 {host}:{port}，worker进程数: {workers}")
         uvicorn.run(
-            app,
+            "main:app",
             host=host,
             port=port,
             reload=False,
+            loop="uvloop" if sys.platform != "win32" else "asyncio",
+            http="httptools",
+            workers=workers,
             log_level=log_level
         )
 
@@ -132,6 +147,9 @@ if __name__ == "__main__":
     # 从环境变量获取配置
     port = int(os.getenv("PORT", "8000"))
     dev_mode = os.getenv("DEV_MODE", "true").lower() in ("true", "1", "yes")
+    # 任务保存在进程内存中时，多个worker进程之间无法共享任务，默认只启动一个worker
+    default_workers = (os.cpu_count() or 1) if config.redis.enabled else 1
+    workers = int(os.getenv("WORKERS", str(default_workers)))
     
     # 启动服务器
-    start_server(port=port, dev_mode=dev_mode) 
\ No newline at end of file
+    start_server(port=port, dev_mode=dev_mode, workers=workers) 
\ No newline at end of file